@@ -1,16 +1,37 @@
 """Graphiti API - FastAPI Wrapper for Turkwise."""
 
+import asyncio
+import hashlib
+import hmac
+from cachetools import TTLCache
 from contextlib import asynccontextmanager
-from fastapi import FastAPI, HTTPException, Security, Depends
+from functools import lru_cache
+from itertools import zip_longest
+from fastapi import FastAPI, HTTPException, Security, Depends, Query, Request, Response
+from fastapi.exceptions import RequestValidationError
+from fastapi.responses import JSONResponse, StreamingResponse
 from fastapi.security import APIKeyHeader
+from falkordb.asyncio import FalkorDB
 from graphiti_core import Graphiti
+from graphiti_core.driver.driver import GraphDriver
 from graphiti_core.driver.falkordb_driver import FalkorDriver
-from graphiti_core.nodes import EpisodeType
-from pydantic import BaseModel
+from graphiti_core.nodes import EpisodeType, EpisodicNode
+from graphiti_core.search.search_config import (
+    EdgeReranker,
+    EdgeSearchConfig,
+    EdgeSearchMethod,
+    SearchConfig,
+)
+from graphiti_core.search.search_config_recipes import EDGE_HYBRID_SEARCH_RRF
+from graphiti_core.utils.bulk_utils import RawEpisode
 import os
-from typing import List, Optional, Dict, Any
+import re
+from typing import List, Literal, Optional, Dict, Any, AsyncIterator, Awaitable, Callable, NamedTuple, Set, Tuple, Union
 import logging
-from datetime import datetime
+from datetime import datetime, timezone
+import msgspec
+import orjson
+from redis.asyncio import BlockingConnectionPool
 
 # Logging setup
 logging.basicConfig(level=os.getenv("LOG_LEVEL", "INFO"))
@@ -20,50 +41,392 @@ logger = logging.getLogger(__name__)
 FALKORDB_HOST = os.getenv("FALKORDB_HOST", "localhost")
 FALKORDB_PORT = int(os.getenv("FALKORDB_PORT", "6379"))
 FALKORDB_PASSWORD = os.getenv("FALKORDB_PASSWORD")
+FALKORDB_MAX_CONNECTIONS = int(os.getenv("FALKORDB_MAX_CONNECTIONS", "32"))
+BUILD_INDICES = os.getenv("BUILD_INDICES", "auto")  # startup build on the default graph: auto (if missing), always, never
+EPISODE_BATCH_WINDOW_MS = float(os.getenv("EPISODE_BATCH_WINDOW_MS", "0"))  # 0 disables batching
+EPISODE_BATCH_MAX = int(os.getenv("EPISODE_BATCH_MAX", "32"))
+RESPONSE_CACHE_SIZE = int(os.getenv("RESPONSE_CACHE_SIZE", "10000"))
+RESPONSE_CACHE_TTL = float(os.getenv("RESPONSE_CACHE_TTL", "0"))  # seconds, 0 disables (per worker, see README)
 TURKWISE_API_KEY = os.getenv("TURKWISE_API_KEY")
 TENANT_PREFIX = os.getenv("TENANT_PREFIX", "turkwise_")
+STREAM_CHUNK_SIZE = int(os.getenv("STREAM_CHUNK_SIZE", "512"))
+STREAM_THRESHOLD = int(os.getenv("STREAM_THRESHOLD", "10000"))  # lists longer than this are streamed
+
+# Episode source lookup, built once instead of EpisodeType[...] per request
+_SOURCE_MAP: Dict[str, EpisodeType] = {
+    "message": EpisodeType.message,
+    "text": EpisodeType.text,
+    "json": EpisodeType.json,
+}
+_INVALID_SOURCE_HINT = f"Valid values: {', '.join(_SOURCE_MAP)}"
+
+# ISO-8601 parser: ciso8601 (C extension) when installed, stdlib otherwise
+try:
+    from ciso8601 import parse_datetime as _fromiso
+except ImportError:
+    _fromiso = datetime.fromisoformat
+
+# Coarse UTC clock refreshed by a lifespan task, used for default reference times
+CLOCK_RESOLUTION = 0.05  # seconds
+_utc_now: datetime = datetime.now(timezone.utc)
+
+# /health bodies never change for a given connection state, so encode them once
+_FALKORDB_ADDR = f"{FALKORDB_HOST}:{FALKORDB_PORT}"
+_HEALTH_CONNECTED = orjson.dumps({"status": "healthy", "graphiti": "connected", "falkordb": _FALKORDB_ADDR})
+_HEALTH_DISCONNECTED = orjson.dumps({"status": "healthy", "graphiti": "disconnected", "falkordb": _FALKORDB_ADDR})
+
+# Edge search configs per /search mode; "hybrid" is the recipe Graphiti.search uses
+_SEARCH_CONFIGS: Dict[str, SearchConfig] = {
+    "hybrid": EDGE_HYBRID_SEARCH_RRF,
+    "semantic": SearchConfig(
+        edge_config=EdgeSearchConfig(
+            search_methods=[EdgeSearchMethod.cosine_similarity],
+            reranker=EdgeReranker.rrf,
+        ),
+    ),
+    "keyword": SearchConfig(
+        edge_config=EdgeSearchConfig(
+            search_methods=[EdgeSearchMethod.bm25],
+            reranker=EdgeReranker.rrf,
+        ),
+    ),
+}
+
+# Tenant delete: one server-side DETACH DELETE on the tenant's graph (also drops its edges)
+_DELETE_TENANT_QUERY = "MATCH (n {group_id: $group_id}) DETACH DELETE n"
+
+# Entity listing/counting, deduplicated server-side
+_LIST_ENTITIES_QUERY = (
+    "MATCH (e:Entity {group_id: $group_id}) "
+    "RETURN DISTINCT e.name AS name, e.uuid AS uuid, e.summary AS summary "
+    "LIMIT $limit"
+)
+_COUNT_ENTITIES_QUERY = (
+    "MATCH (e:Entity {group_id: $group_id}) "
+    "RETURN count(DISTINCT e) AS entities_count"
+)
+
+# Cheap probe used to skip index builds on an already-initialized graph
+_LIST_INDEXES_QUERY = "CALL db.indexes()"
+
+# Per-tenant data version, bumped on every write/delete; part of cache keys so
+# a write makes that tenant's cached responses unreachable (on this worker only)
+_TENANT_VERSION: Dict[str, int] = {}
+
+# Exact-match /search cache: (group_id, version, query, limit, mode) -> encoded body
+_SEARCH_CACHE: Optional[TTLCache] = (
+    TTLCache(maxsize=RESPONSE_CACHE_SIZE, ttl=RESPONSE_CACHE_TTL) if RESPONSE_CACHE_TTL > 0 else None
+)
+
+# /entities and /stats cache: (endpoint, group_id, version, ...) -> CachedBody
+_GET_CACHE: Optional[TTLCache] = (
+    TTLCache(maxsize=RESPONSE_CACHE_SIZE, ttl=RESPONSE_CACHE_TTL) if RESPONSE_CACHE_TTL > 0 else None
+)
 
-# Global Graphiti client
-graphiti_client: Optional[Graphiti] = None
+# Pending /episodes writes, drained by the batcher task (None when batching is off)
+episode_queue: Optional["asyncio.Queue[Tuple[str, RawEpisode, asyncio.Future]]"] = None
 
 # API Key Security
 api_key_header = APIKeyHeader(name="X-API-KEY", auto_error=True)
 
+# Expected key as bytes, encoded once; empty means no key configured
+_EXPECTED_API_KEY = TURKWISE_API_KEY.encode() if TURKWISE_API_KEY else b""
+
+
 async def verify_api_key(api_key: str = Security(api_key_header)) -> str:
-    """Verify Turkwise API key."""
-    if api_key != TURKWISE_API_KEY:
+    """Verify Turkwise API key (constant-time compare)."""
+    if not _EXPECTED_API_KEY or not hmac.compare_digest(api_key.encode(), _EXPECTED_API_KEY):
         raise HTTPException(status_code=401, detail="Invalid API key")
     return api_key
 
 
+@lru_cache(maxsize=4096)
+def _group_id(tenant_id: str) -> str:
+    """Multi-tenant isolation: group_id = tenant prefix + tenant_id."""
+    return f"{TENANT_PREFIX}{tenant_id}"
+
+
+async def get_graphiti(request: Request) -> Graphiti:
+    """Dependency: the Graphiti client created in lifespan (app.state.graphiti)."""
+    graphiti = getattr(request.app.state, "graphiti", None)
+    if graphiti is None:
+        raise HTTPException(status_code=503, detail="Graphiti not initialized")
+    return graphiti
+
+
+@lru_cache(maxsize=4096)
+def _tenant_driver(driver: GraphDriver, group_id: str) -> GraphDriver:
+    """
+    Driver bound to a tenant's graph.
+
+    With graphiti-core >= 0.30.2 on FalkorDB, Graphiti reads and writes a
+    single group_id on a graph named after it (a ``driver.clone(database=group_id)``
+    per call), so tenant queries must not run on the default-database driver.
+    Cached because each clone schedules an index build on its graph;
+    BUILD_INDICES=never cancels it for these clones only. Graphiti's own
+    per-call clones still build indices on the tenant graph.
+    """
+    tenant_driver = driver.clone(database=group_id)
+    if BUILD_INDICES == "never":
+        _cancel_index_build(tenant_driver)
+    return tenant_driver
+
+
+async def _execute_cypher(graphiti: Graphiti, group_id: str, query: str, **params: Any) -> List[Dict[str, Any]]:
+    """Run a Cypher query on a tenant's graph, with ``$group_id`` bound."""
+    records, _, _ = await _tenant_driver(graphiti.driver, group_id).execute_query(query, group_id=group_id, **params)
+    return records
+
+
+def _bump_tenant_version(group_id: str) -> None:
+    """Invalidate cached responses for a tenant after its data changed."""
+    _TENANT_VERSION[group_id] = _TENANT_VERSION.get(group_id, 0) + 1
+
+
+class CachedBody(NamedTuple):
+    """Encoded GET response body and its ETag."""
+    body: bytes
+    etag: str
+
+
+def _etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Whether an If-None-Match header value covers ``etag``."""
+    if not if_none_match:
+        return False
+    candidates = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+    return etag in candidates or "*" in candidates
+
+
+async def _cached_get(
+    request: Request,
+    key: Tuple,
+    build: Callable[[], Awaitable[Dict[str, Any]]],
+    stream_key: Optional[str] = None,
+) -> Response:
+    """
+    Serve an idempotent GET from pre-encoded bytes, with ETag / 304 support.
+
+    ``key`` must include the tenant version so writes invalidate it; on a
+    miss ``build`` runs the query and its result is encoded and hashed once.
+    Only a list under ``stream_key`` longer than STREAM_THRESHOLD is
+    streamed instead, uncached and without an ETag (that would need the
+    whole body in memory).
+    """
+    cached = _GET_CACHE.get(key) if _GET_CACHE is not None else None
+    if cached is None:
+        payload = await build()
+        if stream_key is not None and len(payload[stream_key]) > STREAM_THRESHOLD:
+            items = payload.pop(stream_key)
+            return _list_response(payload, stream_key, items)
+
+        body = orjson.dumps(payload, option=orjson.OPT_NAIVE_UTC)
+        cached = CachedBody(body, f'"{hashlib.blake2b(body, digest_size=8).hexdigest()}"')
+        if _GET_CACHE is not None:
+            _GET_CACHE[key] = cached
+
+    if _etag_matches(request.headers.get("if-none-match"), cached.etag):
+        return Response(status_code=304, headers={"ETag": cached.etag})
+    return Response(content=cached.body, media_type="application/json", headers={"ETag": cached.etag})
+
+
+class ORJSONUTCResponse(JSONResponse):
+    """orjson response that encodes datetimes natively (naive values as UTC).
+
+    Handlers return this directly so FastAPI skips the ``jsonable_encoder``
+    walk it otherwise runs over plain dict return values. Subclasses
+    Starlette's ``JSONResponse`` (so OpenAPI still documents JSON bodies)
+    rather than FastAPI's deprecated ``ORJSONResponse``.
+    """
+
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content, option=orjson.OPT_NAIVE_UTC)
+
+
+def _list_response(envelope: Dict[str, Any], key: str, items: List[Any]) -> StreamingResponse:
+    """
+    Stream ``envelope`` plus ``items`` under ``key`` as chunked JSON.
+
+    Items are orjson-encoded STREAM_CHUNK_SIZE at a time, so only one chunk
+    of the body is materialized at once.
+    """
+    async def body() -> AsyncIterator[bytes]:
+        # Open the envelope and leave it waiting for the list: {...,"key":[
+        yield orjson.dumps(envelope, option=orjson.OPT_NAIVE_UTC)[:-1] + b"," + orjson.dumps(key) + b":["
+        for start in range(0, len(items), STREAM_CHUNK_SIZE):
+            encoded = orjson.dumps(items[start:start + STREAM_CHUNK_SIZE], option=orjson.OPT_NAIVE_UTC)
+            yield (b"," if start else b"") + encoded[1:-1]
+        yield b"]}"
+
+    return StreamingResponse(body(), media_type="application/json")
+
+
+def _cancel_index_build(driver: GraphDriver) -> None:
+    """Drop the index build FalkorDriver schedules when created inside a running loop."""
+    init_task = getattr(driver, "_init_task", None)
+    if init_task is not None:
+        init_task.cancel()
+
+
+async def _has_indices(graphiti: Graphiti) -> bool:
+    """Whether the default graph already has indices (a missing graph counts as none)."""
+    try:
+        result = await graphiti.driver.execute_query(_LIST_INDEXES_QUERY)
+        return bool(result and result[0])
+    except Exception as e:
+        logger.info(f"Index probe failed, building indices: {str(e)}")
+        return False
+
+
+async def _clock_ticker() -> None:
+    """Refresh the coarse clock so requests skip a datetime.now() each."""
+    global _utc_now
+    while True:
+        _utc_now = datetime.now(timezone.utc)
+        await asyncio.sleep(CLOCK_RESOLUTION)
+
+
+class EpisodeWrite(NamedTuple):
+    """Outcome of one /episodes write, direct or batched."""
+    episode: EpisodicNode
+    nodes_created: int
+    edges_created: int
+    batch_size: int
+
+
+async def _add_episodes(graphiti: Graphiti, group_id: str, pending: List[Tuple[RawEpisode, asyncio.Future]]) -> None:
+    """Write one tenant's batch and resolve each request's future."""
+    try:
+        if len(pending) == 1:
+            raw, _ = pending[0]
+            result = await graphiti.add_episode(
+                name=raw.name,
+                episode_body=raw.content,
+                source=raw.source,
+                source_description=raw.source_description,
+                reference_time=raw.reference_time,
+                group_id=group_id,
+            )
+            writes = [EpisodeWrite(result.episode, len(result.nodes), len(result.edges), 1)]
+        else:
+            # Node/edge counts are only known for the batch as a whole
+            results = await graphiti.add_episode_bulk([raw for raw, _ in pending], group_id=group_id)
+            writes = [
+                EpisodeWrite(episode, len(results.nodes), len(results.edges), len(pending))
+                for episode in results.episodes
+            ]
+    except Exception as e:
+        for _, future in pending:
+            if not future.done():
+                future.set_exception(e)
+        return
+
+    # Waiters cancelled mid-write (client gone) are already done; skip them
+    for (_, future), write in zip(pending, writes):
+        if not future.done():
+            future.set_result(write)
+
+
+async def _episode_batcher(graphiti: Graphiti, queue: "asyncio.Queue[Tuple[str, RawEpisode, asyncio.Future]]") -> None:
+    """
+    Coalesce /episodes writes arriving within EPISODE_BATCH_WINDOW_MS.
+
+    Each window is grouped by tenant and written with one add_episode_bulk
+    call per tenant; flushes run as separate tasks so the next window opens
+    immediately. Concurrent flushes for different tenants share one Graphiti,
+    which is only safe with graphiti-core >= 0.30.2: older versions swap
+    ``graphiti.driver`` to the group_id's graph inside add_episode(_bulk),
+    so one tenant's flush could write into another's graph.
+    """
+    loop = asyncio.get_running_loop()
+    window = EPISODE_BATCH_WINDOW_MS / 1000
+    in_flight: Set[asyncio.Task] = set()
+
+    while True:
+        batch = [await queue.get()]
+        deadline = loop.time() + window
+        while len(batch) < EPISODE_BATCH_MAX:
+            timeout = deadline - loop.time()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(queue.get(), timeout))
+            except asyncio.TimeoutError:
+                break
+
+        by_group: Dict[str, List[Tuple[RawEpisode, asyncio.Future]]] = {}
+        for group_id, raw, future in batch:
+            by_group.setdefault(group_id, []).append((raw, future))
+
+        for group_id, pending in by_group.items():
+            task = asyncio.create_task(_add_episodes(graphiti, group_id, pending))
+            in_flight.add(task)
+            task.add_done_callback(in_flight.discard)
+
+
+async def _submit_episode(graphiti: Graphiti, group_id: str, raw: RawEpisode) -> EpisodeWrite:
+    """Write an episode directly, or via the batcher when batching is on."""
+    future = asyncio.get_running_loop().create_future()
+    if episode_queue is None:
+        await _add_episodes(graphiti, group_id, [(raw, future)])
+    else:
+        await episode_queue.put((group_id, raw, future))
+    return await future
+
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Application lifespan."""
-    global graphiti_client
+    global episode_queue
 
     # Startup: Initialize Graphiti with FalkorDB
     logger.info("Initializing Graphiti client...")
 
-    # Create FalkorDB driver
-    falkor_driver = FalkorDriver(
+    # Create FalkorDB driver on a bounded, keep-alive connection pool
+    # (FalkorDB parses decoded replies, so decode_responses must stay on)
+    connection_pool = BlockingConnectionPool(
         host=FALKORDB_HOST,
-        port=int(FALKORDB_PORT),
+        port=FALKORDB_PORT,
         password=FALKORDB_PASSWORD,
+        max_connections=FALKORDB_MAX_CONNECTIONS,
+        socket_keepalive=True,
+        decode_responses=True,
     )
+    falkor_driver = FalkorDriver(falkor_db=FalkorDB(connection_pool=connection_pool))
+    # Built inside the running loop, the driver has already queued its own
+    # index build; cancel it so BUILD_INDICES decides the default graph's build below
+    _cancel_index_build(falkor_driver)
+
+    # Initialize Graphiti with driver; handlers receive it via Depends(get_graphiti)
+    graphiti = Graphiti(graph_driver=falkor_driver)
+    app.state.graphiti = graphiti
+
+    # Build indices and constraints on the default graph ("auto" skips it if it has them).
+    # Tenant graphs are not covered: Graphiti's per-call clones build their own.
+    if BUILD_INDICES == "always" or (BUILD_INDICES == "auto" and not await _has_indices(graphiti)):
+        await graphiti.build_indices_and_constraints()
+        logger.info("Graphiti indices and constraints built")
+    logger.info("Graphiti client initialized successfully")
 
-    # Initialize Graphiti with driver
-    graphiti_client = Graphiti(graph_driver=falkor_driver)
+    ticker = asyncio.create_task(_clock_ticker())
 
-    # Build indices and constraints
-    await graphiti_client.build_indices_and_constraints()
-    logger.info("Graphiti client initialized successfully")
+    batcher = None
+    if EPISODE_BATCH_WINDOW_MS > 0:
+        episode_queue = asyncio.Queue()
+        batcher = asyncio.create_task(_episode_batcher(graphiti, episode_queue))
+        logger.info(f"Episode batching enabled ({EPISODE_BATCH_WINDOW_MS:g}ms window)")
 
     yield
 
     # Shutdown
-    if graphiti_client:
-        await graphiti_client.close()
-        logger.info("Graphiti client closed")
+    ticker.cancel()
+    if batcher:
+        batcher.cancel()
+        episode_queue = None
+    app.state.graphiti = None
+    await graphiti.close()
+    # The client doesn't own a pool passed in, so its close leaves these sockets open
+    await connection_pool.aclose()
+    logger.info("Graphiti client closed")
 
 
 app = FastAPI(
@@ -71,92 +434,211 @@ app = FastAPI(
     description="Temporal Knowledge Graph API powered by Graphiti + FalkorDB",
     version="1.0.0",
     lifespan=lifespan,
+    default_response_class=ORJSONUTCResponse,
 )
 
 
 # ===== MODELS =====
 
-class EpisodeRequest(BaseModel):
+class EpisodeRequest(msgspec.Struct):
     """Episode creation request."""
     tenant_id: str
-    content: str
+    content: Union[str, Dict[str, Any], List[Any]]  # object/array accepted as-is for source "json"
     source: str = "message"  # Valid values: "message", "text", "json"
     source_description: Optional[str] = None
     reference_time: Optional[str] = None  # ISO format datetime, defaults to now
     metadata: Optional[Dict[str, Any]] = None
 
 
-class SearchRequest(BaseModel):
+class SearchRequest(msgspec.Struct):
     """Memory search request."""
     tenant_id: str
     query: str
     limit: int = 10
     include_edges: bool = True
+    mode: Literal["hybrid", "semantic", "keyword"] = "hybrid"  # semantic skips BM25, keyword skips embedding
 
 
-class EntityRequest(BaseModel):
+class EntityRequest(msgspec.Struct):
     """Entity query request."""
     tenant_id: str
     entity_name: str
 
 
+def _episode_body(request: EpisodeRequest, source: EpisodeType) -> str:
+    """
+    Episode body as the string Graphiti stores.
+
+    For source "json" the content may arrive already decoded (object/array,
+    parsed in the same pass as the request) or as a JSON string, which is
+    checked once with orjson so malformed JSON fails before any LLM call.
+    """
+    content = request.content
+    if source is not EpisodeType.json:
+        if not isinstance(content, str):
+            raise HTTPException(status_code=400, detail=f"content must be a string for source {source.name}")
+        return content
+
+    if isinstance(content, str):
+        try:
+            orjson.loads(content)
+        except orjson.JSONDecodeError as e:
+            raise HTTPException(status_code=400, detail=f"content is not valid JSON: {str(e)}")
+        return content
+    try:
+        return orjson.dumps(content).decode()
+    except orjson.JSONEncodeError as e:
+        raise HTTPException(status_code=400, detail=f"content cannot be encoded as JSON: {str(e)}")
+
+
+# msgspec reports the failing field as a trailing " - at `$.a.b[0]`" path
+_ERROR_PATH = re.compile(r" - at `\$(.*)`$")
+_ERROR_PATH_PART = re.compile(r"\.([^.\[]+)|\[(\d+)\]")
+_MISSING_FIELD = re.compile(r"Object missing required field `(.+)`")
+
+
+def _validation_error(message: str) -> Dict[str, Any]:
+    """One FastAPI-style ``{loc, msg, type}`` entry from a msgspec error message."""
+    loc: List[Union[str, int]] = ["body"]
+    path = _ERROR_PATH.search(message)
+    if path:
+        message = message[:path.start()]
+        loc += [int(index) if index else key for key, index in _ERROR_PATH_PART.findall(path.group(1))]
+
+    missing = _MISSING_FIELD.fullmatch(message)
+    if missing:
+        return {"loc": loc + [missing.group(1)], "msg": "Field required", "type": "missing"}
+    return {"loc": loc, "msg": message, "type": "value_error"}
+
+
+def _json_body(model: type) -> Callable:
+    """
+    Dependency decoding the raw JSON body straight into a msgspec ``model``.
+
+    Replaces FastAPI's Pydantic body validation: one C-level pass, no
+    intermediate dict. Decoding is lax like Pydantic's (``"10"`` is a valid
+    int) and failures raise RequestValidationError, so clients keep getting
+    FastAPI's 422 ``detail`` list.
+    """
+    decode = msgspec.json.Decoder(model, strict=False).decode
+
+    async def dependency(request: Request):
+        body = await request.body()
+        if not body:
+            raise RequestValidationError([{"loc": ["body"], "msg": "Field required", "type": "missing"}])
+        try:
+            return decode(body)
+        except msgspec.ValidationError as e:
+            raise RequestValidationError([_validation_error(str(e))])
+        except msgspec.DecodeError as e:
+            raise RequestValidationError([{"loc": ["body"], "msg": f"JSON decode error: {str(e)}", "type": "json_invalid"}])
+
+    return dependency
+
+
+def _openapi_body(model: type) -> Dict[str, Any]:
+    """OpenAPI requestBody (and 422 response) for a msgspec ``model`` read by ``_json_body``."""
+    _, components = msgspec.json.schema_components([model])
+    return {
+        "requestBody": {
+            "required": True,
+            "content": {"application/json": {"schema": components[model.__name__]}},
+        },
+        "responses": {
+            "422": {
+                "description": "Validation Error",
+                "content": {
+                    "application/json": {"schema": {"$ref": "#/components/schemas/HTTPValidationError"}},
+                },
+            },
+        },
+    }
+
+
+class SearchHit(msgspec.Struct):
+    """Single /search result (encoded by msgspec)."""
+    uuid: str
+    content: Optional[str] = None
+    score: Optional[float] = None
+    created_at: Optional[str] = None  # from _utc_isoformat, matching the orjson endpoints
+
+
+def _utc_isoformat(value: Optional[datetime]) -> Optional[str]:
+    """ISO-8601 string with naive values taken as UTC (``+00:00``, like OPT_NAIVE_UTC)."""
+    if value is None:
+        return None
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.isoformat()
+
+
+class SearchResponse(msgspec.Struct):
+    """/search response body."""
+    success: bool
+    query: str
+    group_id: str
+    results_count: int
+    results: List[SearchHit]
+
+
+_encode_json = msgspec.json.Encoder().encode
+
+
 # ===== ENDPOINTS =====
 
 @app.get("/health")
-async def health_check():
+async def health_check(request: Request):
     """Health check endpoint."""
-    return {
-        "status": "healthy",
-        "graphiti": "connected" if graphiti_client else "disconnected",
-        "falkordb": f"{FALKORDB_HOST}:{FALKORDB_PORT}",
-    }
+    return Response(
+        content=_HEALTH_CONNECTED if getattr(request.app.state, "graphiti", None) else _HEALTH_DISCONNECTED,
+        media_type="application/json",
+    )
 
 
-@app.post("/episodes", dependencies=[Depends(verify_api_key)])
-async def add_episode(request: EpisodeRequest):
+@app.post("/episodes", dependencies=[Depends(verify_api_key)], openapi_extra=_openapi_body(EpisodeRequest))
+async def add_episode(
+    request: EpisodeRequest = Depends(_json_body(EpisodeRequest)),
+    graphiti: Graphiti = Depends(get_graphiti),
+):
     """
     Add new episode (conversation, event, etc.) to knowledge graph.
 
     Multi-tenant isolation via group_id.
     """
-    if not graphiti_client:
-        raise HTTPException(status_code=503, detail="Graphiti not initialized")
-
-    # Multi-tenant isolation: group_id = tenant prefix + tenant_id
-    group_id = f"{TENANT_PREFIX}{request.tenant_id}"
+    group_id = _group_id(request.tenant_id)
 
     try:
-        # Parse reference time or use current time
-        ref_time = datetime.fromisoformat(request.reference_time) if request.reference_time else datetime.now()
+        # Parse reference time or use current time (coarse clock, CLOCK_RESOLUTION accuracy)
+        ref_time = _fromiso(request.reference_time) if request.reference_time else _utc_now
 
-        # Convert source string to EpisodeType enum
-        try:
-            source_enum = EpisodeType[request.source.lower()]
-        except KeyError:
-            raise HTTPException(status_code=400, detail=f"Invalid source type: {request.source}. Valid values: message, text, json")
+        # Convert source string to EpisodeType enum (exact match first, then case-insensitive)
+        source_enum = _SOURCE_MAP.get(request.source) or _SOURCE_MAP.get(request.source.lower())
+        if source_enum is None:
+            raise HTTPException(status_code=400, detail=f"Invalid source type: {request.source}. {_INVALID_SOURCE_HINT}")
 
-        episodes = await graphiti_client.add_episode(
+        written = await _submit_episode(graphiti, group_id, RawEpisode(
             name=request.source_description or "Customer Conversation",
-            episode_body=request.content,
+            content=_episode_body(request, source_enum),
             source=source_enum,
             source_description=request.source_description or "",
             reference_time=ref_time,
-            group_id=group_id,
-        )
+        ))
 
+        _bump_tenant_version(group_id)
         logger.info(f"Episode added for tenant {request.tenant_id}")
 
-        return {
+        return ORJSONUTCResponse({
             "success": True,
             "group_id": group_id,
             "episode": {
-                "uuid": episodes.episode.uuid,
-                "name": episodes.episode.name,
-                "created_at": episodes.episode.created_at.isoformat() if hasattr(episodes.episode, 'created_at') else None,
+                "uuid": written.episode.uuid,
+                "name": written.episode.name,
+                "created_at": getattr(written.episode, 'created_at', None),
             },
-            "nodes_created": len(episodes.nodes),
-            "edges_created": len(episodes.edges),
-        }
+            "nodes_created": written.nodes_created,
+            "edges_created": written.edges_created,
+            "batch_size": written.batch_size,
+        })
 
     except HTTPException:
         raise
@@ -165,42 +647,47 @@ async def add_episode(request: EpisodeRequest):
         raise HTTPException(status_code=500, detail=str(e))
 
 
-@app.post("/search", dependencies=[Depends(verify_api_key)])
-async def search_memory(request: SearchRequest):
+@app.post("/search", dependencies=[Depends(verify_api_key)], openapi_extra=_openapi_body(SearchRequest))
+async def search_memory(
+    request: SearchRequest = Depends(_json_body(SearchRequest)),
+    graphiti: Graphiti = Depends(get_graphiti),
+):
     """
-    Search knowledge graph using hybrid search.
+    Search knowledge graph.
 
-    Combines: Semantic similarity + BM25 + Graph traversal
+    mode="hybrid" (default) fuses BM25 and embedding similarity over edges with RRF.
+    mode="semantic" skips BM25; mode="keyword" skips the query embedding call.
     """
-    if not graphiti_client:
-        raise HTTPException(status_code=503, detail="Graphiti not initialized")
+    group_id = _group_id(request.tenant_id)
 
-    group_id = f"{TENANT_PREFIX}{request.tenant_id}"
+    cache_key = (group_id, _TENANT_VERSION.get(group_id, 0), request.query, request.limit, request.mode)
+    if _SEARCH_CACHE is not None:
+        cached = _SEARCH_CACHE.get(cache_key)
+        if cached is not None:
+            return Response(content=cached, media_type="application/json")
 
     try:
-        results = await graphiti_client.search(
+        config = _SEARCH_CONFIGS[request.mode].model_copy(update={"limit": request.limit})
+        search_results = await graphiti.search_(
             query=request.query,
+            config=config,
             group_ids=[group_id],
-            num_results=request.limit,
         )
+        results = search_results.edges
 
         logger.info(f"Search completed for tenant {request.tenant_id}: {len(results)} results")
 
-        return {
-            "success": True,
-            "query": request.query,
-            "group_id": group_id,
-            "results_count": len(results),
-            "results": [
-                {
-                    "uuid": r.uuid,
-                    "content": r.content,
-                    "score": r.score if hasattr(r, 'score') else None,
-                    "created_at": r.created_at.isoformat() if hasattr(r, 'created_at') else None,
-                }
-                for r in results
-            ],
-        }
+        # Results are EntityEdges (text in .fact); scores come back alongside them
+        hits = [
+            SearchHit(r.uuid, r.fact, score, _utc_isoformat(r.created_at))
+            for r, score in zip_longest(results, search_results.edge_reranker_scores)
+        ]
+
+        body = _encode_json(SearchResponse(True, request.query, group_id, len(hits), hits))
+        if _SEARCH_CACHE is not None:
+            _SEARCH_CACHE[cache_key] = body
+
+        return Response(content=body, media_type="application/json")
 
     except Exception as e:
         logger.error(f"Search failed: {str(e)}")
@@ -208,41 +695,34 @@ async def search_memory(request: SearchRequest):
 
 
 @app.get("/entities/{tenant_id}", dependencies=[Depends(verify_api_key)])
-async def get_entities(tenant_id: str):
+async def get_entities(
+    request: Request,
+    tenant_id: str,
+    limit: int = Query(1000, ge=1),
+    graphiti: Graphiti = Depends(get_graphiti),
+):
     """
-    Get all entities for a tenant.
+    Get all entities for a tenant (up to ``limit``).
 
-    Returns semantic entities extracted from conversations.
+    Returns semantic entities extracted from conversations. Listing needs no
+    ranking, so this is a direct Entity node scan: no embedding, BM25 or
+    graph traversal.
     """
-    if not graphiti_client:
-        raise HTTPException(status_code=503, detail="Graphiti not initialized")
-
-    group_id = f"{TENANT_PREFIX}{tenant_id}"
+    group_id = _group_id(tenant_id)
 
     try:
-        # Search for entities using empty query to get all
-        results = await graphiti_client.search(
-            query="",
-            group_ids=[group_id],
-            num_results=1000,  # Large number to get all entities
-        )
-
-        # Extract unique entities from results
-        entities_dict = {}
-        for result in results:
-            if hasattr(result, 'fact') and hasattr(result.fact, 'name'):
-                entities_dict[result.fact.name] = {
-                    "name": result.fact.name,
-                    "uuid": result.fact.uuid,
-                    "summary": result.fact.summary if hasattr(result.fact, 'summary') else None,
-                }
-
-        return {
-            "success": True,
-            "group_id": group_id,
-            "entities_count": len(entities_dict),
-            "entities": list(entities_dict.values()),
-        }
+        async def build() -> Dict[str, Any]:
+            # DISTINCT entities straight from the graph, no client-side dedup
+            entities = await _execute_cypher(graphiti, group_id, _LIST_ENTITIES_QUERY, limit=limit)
+            return {
+                "success": True,
+                "group_id": group_id,
+                "entities_count": len(entities),
+                "entities": entities,
+            }
+
+        key = ("entities", group_id, _TENANT_VERSION.get(group_id, 0), limit)
+        return await _cached_get(request, key, build, stream_key="entities")
 
     except Exception as e:
         logger.error(f"Get entities failed: {str(e)}")
@@ -250,45 +730,36 @@ async def get_entities(tenant_id: str):
 
 
 @app.get("/stats/{tenant_id}", dependencies=[Depends(verify_api_key)])
-async def get_tenant_stats(tenant_id: str):
+async def get_tenant_stats(request: Request, tenant_id: str, graphiti: Graphiti = Depends(get_graphiti)):
     """
     Get tenant statistics.
 
     Returns episode count, entity count, relationship count, etc.
     """
-    if not graphiti_client:
-        raise HTTPException(status_code=503, detail="Graphiti not initialized")
-
-    group_id = f"{TENANT_PREFIX}{tenant_id}"
+    group_id = _group_id(tenant_id)
 
     try:
-        # Get episodes using retrieve_episodes
-        episodes = await graphiti_client.retrieve_episodes(
-            reference_time=datetime.now(),
-            last_n=10000,  # Large number to get all episodes
-            group_ids=[group_id],
-        )
-
-        # Get entities using search
-        entity_results = await graphiti_client.search(
-            query="",
-            group_ids=[group_id],
-            num_results=10000,
-        )
-
-        # Count unique entities
-        unique_entities = set()
-        for result in entity_results:
-            if hasattr(result, 'fact') and hasattr(result.fact, 'uuid'):
-                unique_entities.add(result.fact.uuid)
-
-        return {
-            "success": True,
-            "tenant_id": tenant_id,
-            "group_id": group_id,
-            "episodes_count": len(episodes),
-            "entities_count": len(unique_entities),
-        }
+        async def build() -> Dict[str, Any]:
+            # Episodes (retrieve_episodes) and entity count (Cypher) are independent,
+            # so run both round-trips concurrently; both read the tenant's graph
+            episodes, entity_counts = await asyncio.gather(
+                graphiti.retrieve_episodes(
+                    reference_time=datetime.now(timezone.utc),
+                    last_n=10000,  # Large number to get all episodes
+                    group_ids=[group_id],
+                ),
+                _execute_cypher(graphiti, group_id, _COUNT_ENTITIES_QUERY),
+            )
+            return {
+                "success": True,
+                "tenant_id": tenant_id,
+                "group_id": group_id,
+                "episodes_count": len(episodes),
+                "entities_count": entity_counts[0]["entities_count"] if entity_counts else 0,
+            }
+
+        key = ("stats", group_id, _TENANT_VERSION.get(group_id, 0))
+        return await _cached_get(request, key, build)
 
     except Exception as e:
         logger.error(f"Get stats failed: {str(e)}")
@@ -296,7 +767,7 @@ async def get_tenant_stats(tenant_id: str):
 
 
 @app.delete("/tenant/{tenant_id}", dependencies=[Depends(verify_api_key)])
-async def delete_tenant_data(tenant_id: str, confirm: bool = False):
+async def delete_tenant_data(tenant_id: str, confirm: bool = False, graphiti: Graphiti = Depends(get_graphiti)):
     """
     Delete all data for a tenant.
 
@@ -308,15 +779,13 @@ async def delete_tenant_data(tenant_id: str, confirm: bool = False):
             detail="Must set confirm=true to delete tenant data"
         )
 
-    if not graphiti_client:
-        raise HTTPException(status_code=503, detail="Graphiti not initialized")
-
-    group_id = f"{TENANT_PREFIX}{tenant_id}"
+    group_id = _group_id(tenant_id)
 
     try:
-        # Clear all data for this group_id
-        await graphiti_client.clear_data(group_id=group_id)
+        # Clear all data for this group_id in a single round-trip
+        await _execute_cypher(graphiti, group_id, _DELETE_TENANT_QUERY)
 
+        _bump_tenant_version(group_id)
         logger.warning(f"Tenant data deleted: {tenant_id}")
 
         return {